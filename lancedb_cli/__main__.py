@@ -1,26 +1,59 @@
+import json
+import math
+import re
 import typer
-import lancedb
-import duckdb
-import pandas as pd
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import TYPE_CHECKING, Optional, Dict, List, Set, Tuple, Any, Union
 from rich.table import Table
 from rich.console import Console
-from rich.json import JSON
-from prompt_toolkit import PromptSession
-from prompt_toolkit.history import FileHistory
-from prompt_toolkit.lexers import PygmentsLexer
-from prompt_toolkit.completion import WordCompleter
-from pygments.lexers.sql import SqlLexer
+
+# lancedb, duckdb, pandas and prompt_toolkit are slow to import, so they are
+# imported inside the commands that use them to keep --help and startup fast
+if TYPE_CHECKING:
+    import duckdb
+    import lancedb
+    import pyarrow as pa
 
 app = typer.Typer(
     help="lsql - A minimal command line application for managing LanceDB databases"
 )
 console = Console()
+# Console for user data: no markup, emoji or highlighting is applied to cell values
+data_console = Console(highlight=False, markup=False, emoji=False)
 
 # Maximum field length before truncation
 MAX_FIELD_LENGTH = 50
 
+# Number of rows fetched per batch when streaming SQL results
+RESULT_BATCH_SIZE = 1000
+
+# SET clause pairs are separated by commas that are not inside quotes;
+# an unterminated quote runs to the end of the clause
+SET_PAIR_PATTERN = re.compile(r"""(?:"[^"]*(?:"|\Z)|'[^']*(?:'|\Z)|[^,"'])+""")
+SET_ASSIGNMENT_PATTERN = re.compile(r"\s*([^=]*?)\s*=\s*(.*?)\s*", re.DOTALL)
+
+# SET clause values with a fixed meaning, and patterns for typed values
+LITERAL_VALUES = {"true": True, "false": False, "null": None, "none": None}
+# Digits may be grouped with underscores, as int() and float() accept
+DIGITS = r"\d+(?:_\d+)*"
+INT_PATTERN = re.compile(rf"[-+]?{DIGITS}")
+FLOAT_PATTERN = re.compile(rf"[-+]?(?:{DIGITS}\.(?:{DIGITS})?|\.{DIGITS})(?:[eE][-+]?{DIGITS})?")
+# A lone quote character counts as an empty quoted string
+QUOTED_PATTERN = re.compile(r"""(["'])(?:(.*)\1)?""", re.DOTALL)
+
+# Completion words for interactive mode; tuples keep the completion menu order stable
+SQL_KEYWORDS = (
+    "SELECT", "FROM", "WHERE", "LIMIT", "ORDER BY", "GROUP BY", "INSERT", "DELETE", "UPDATE",
+    "JOIN", "LEFT JOIN", "INNER JOIN", "ON", "AND", "OR", "NOT", "IN", "LIKE", "BETWEEN",
+    "DISTINCT", "COUNT", "SUM", "AVG", "MIN", "MAX",
+)
+DOT_COMMANDS = (
+    ".tables", ".schema", ".refresh", ".update", ".delete", ".empty", ".drop",
+    ".begin", ".commit", ".rollback", ".exit",
+)
+# Commands accepted between .begin and .commit/.rollback
+BATCH_COMMANDS = (".update", ".tables", ".schema", ".refresh", ".begin", ".commit", ".rollback")
+
 
 def truncate_value(value: str, max_len: int = MAX_FIELD_LENGTH) -> str:
     """Truncate long values and add ellipsis."""
@@ -30,12 +63,56 @@ def truncate_value(value: str, max_len: int = MAX_FIELD_LENGTH) -> str:
     return value_str
 
 
-def get_table_names(db: lancedb.DBConnection) -> List[str]:
+def truncate_column(
+    values: Union["pa.Array", "pa.ChunkedArray"], max_len: int = MAX_FIELD_LENGTH
+) -> List[str]:
+    """Truncate a whole Arrow column at once and add ellipsis to long values."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    
+    if not (pa.types.is_string(values.type) or pa.types.is_large_string(values.type)):
+        return [truncate_value(v, max_len) for v in values.to_pylist()]
+    
+    # String columns are sliced with Arrow compute kernels instead of per value in Python
+    empty = pa.scalar("", values.type)
+    too_long = pc.greater(pc.utf8_length(values), max_len)
+    suffix = pc.if_else(too_long, pa.scalar("...", values.type), empty)
+    trimmed = pc.utf8_slice_codeunits(values, 0, max_len)
+    truncated = pc.binary_join_element_wise(trimmed, suffix, empty)
+    return truncated.fill_null("None").to_pylist()
+
+
+def get_table_names(db: "lancedb.DBConnection") -> List[str]:
     """Get list of table names from database."""
     result = db.list_tables()
     return result.tables if hasattr(result, 'tables') else result
 
 
+def get_referenced_tables(sql_query: str, table_names: List[str]) -> List[str]:
+    """Return the table names that appear as identifiers in a SQL query."""
+    return [
+        name for name in table_names
+        if re.search(rf"(?<![\w.]){re.escape(name)}(?!\w)", sql_query, re.IGNORECASE)
+    ]
+
+
+def register_table(
+    con: "duckdb.DuckDBPyConnection", table_name: str, table: "lancedb.Table"
+) -> None:
+    """Register an open LanceDB table with a DuckDB connection under the given name.
+
+    The Lance dataset is handed to DuckDB directly so it is scanned in place;
+    when the optional ``pylance`` package is missing, the table is registered
+    as an Arrow table instead, with its chunks combined since DuckDB scans one
+    large batch much faster than many small ones.
+    """
+    try:
+        source = table.to_lance()
+    except ImportError:
+        source = table.to_arrow().combine_chunks()
+    con.register(table_name, source)
+
+
 def validate_database_exists(db_path: str, create: bool = False) -> bool:
     """Check if database exists at given path. Optionally create it if it doesn't.
     
@@ -46,6 +123,8 @@ def validate_database_exists(db_path: str, create: bool = False) -> bool:
     Returns:
         True if database exists or was created successfully, False otherwise
     """
+    import lancedb
+    
     path = Path(db_path)
     
     # Try to connect to the database
@@ -72,7 +151,7 @@ def validate_database_exists(db_path: str, create: bool = False) -> bool:
             return False
 
 
-def validate_table_exists(db: lancedb.DBConnection, table_name: str) -> bool:
+def validate_table_exists(db: "lancedb.DBConnection", table_name: str) -> bool:
     """Check if table exists in database. Prints error message if not."""
     table_names = get_table_names(db)
     if table_name not in table_names:
@@ -85,71 +164,134 @@ def parse_set_clause(set_clause: str) -> Dict[str, Any]:
     """Parse SET clause into key-value pairs with type conversion."""
     update_values = {}
     
-    # Split on comma, but be careful about commas within quoted strings
-    pairs = []
-    current = ""
-    in_quotes = False
-    quote_char = None
-    
-    for char in set_clause:
-        if char in ('"', "'") and (not in_quotes or char == quote_char):
-            in_quotes = not in_quotes
-            if in_quotes:
-                quote_char = char
-            else:
-                quote_char = None
-        if char == "," and not in_quotes:
-            pairs.append(current)
-            current = ""
-        else:
-            current += char
-    if current:
-        pairs.append(current)
-    
-    for pair in pairs:
-        pair = pair.strip()
-        if "=" not in pair:
+    # Split on comma, but be careful about commas within quoted strings. Each pair must
+    # start right after the previous pair's comma, so empty pairs like "a=1,,b=2" are rejected
+    start = 0
+    for pair_match in SET_PAIR_PATTERN.finditer(set_clause):
+        match = SET_ASSIGNMENT_PATTERN.fullmatch(pair_match.group())
+        if pair_match.start() != start or match is None:
             raise ValueError("Invalid SET clause format. Use key=value pairs separated by commas")
+        start = pair_match.end() + 1
         
-        key, value = pair.split("=", 1)
-        key = key.strip()
-        value = value.strip()
+        key, value = match.groups()
         update_values[key] = convert_value(value)
     
+    if start < len(set_clause):
+        raise ValueError("Invalid SET clause format. Use key=value pairs separated by commas")
+    
     return update_values
 
 
 def convert_value(value: str) -> Any:
     """Convert a string value to appropriate type."""
-    if value.lower() == "true":
-        return True
-    elif value.lower() == "false":
-        return False
-    elif value.lower() in ("null", "none"):
-        return None
-    elif (value.startswith('"') and value.endswith('"')) or (value.startswith("'") and value.endswith("'")):
-        return value[1:-1]
-    else:
-        try:
-            if '.' not in value:
-                return int(value)
-            else:
-                return float(value)
-        except ValueError:
-            return value
+    lowered = value.lower()
+    if lowered in LITERAL_VALUES:
+        return LITERAL_VALUES[lowered]
+    if INT_PATTERN.fullmatch(value):
+        return int(value)
+    if FLOAT_PATTERN.fullmatch(value):
+        return float(value)
+    match = QUOTED_PATTERN.fullmatch(value)
+    if match:
+        return match.group(2) or ""
+    return value
 
 
-def render_results(results, title: str = "Results", output_format: str = "table") -> None:
-    """Render query results in specified format."""
+def coalesce_updates(
+    updates: List[Tuple[str, Dict[str, Any]]]
+) -> List[Tuple[str, Dict[str, Any]]]:
+    """Merge consecutive updates that share a WHERE clause so each run is one table rewrite.
+    
+    An update is only merged into the previous run when its WHERE clause does not
+    mention any column the run sets, so the merged result always matches applying
+    the updates one at a time.
+    
+    Args:
+        updates: Pending (where, values) updates in the order they were issued
+    
+    Returns:
+        The updates to apply, in order; within a merged run later values win
+    """
+    merged: List[Tuple[str, Dict[str, Any]]] = []
+    for where, values in updates:
+        if merged and merged[-1][0] == where and not any(
+            re.search(rf"(?<!\w){re.escape(col)}(?!\w)", where, re.IGNORECASE)
+            for col in merged[-1][1]
+        ):
+            merged[-1][1].update(values)
+        else:
+            merged.append((where, dict(values)))
+    return merged
+
+
+def render_arrow_results(results, title: str = "Results", output_format: str = "table") -> None:
+    """Render an Arrow table or record batch in specified format, without going through pandas."""
     if output_format == "json":
-        console.print(JSON(results.to_json(orient="records")))
+        render_json_batches(results.to_batches() if hasattr(results, "to_batches") else [results])
     else:
         rich_table = Table(title=title)
-        for col in results.columns:
-            rich_table.add_column(str(col), style="cyan")
-        for _, row in results.iterrows():
-            rich_table.add_row(*[truncate_value(v) for v in row])
-        console.print(rich_table)
+        # Convert and truncate column by column, then zip the columns into rows
+        columns = []
+        for name, values in zip(results.schema.names, results.columns):
+            rich_table.add_column(str(name), style="cyan")
+            columns.append(truncate_column(values))
+        for row in zip(*columns):
+            rich_table.add_row(*row)
+        data_console.print(rich_table)
+
+
+def fetch_batches(cursor: "duckdb.DuckDBPyConnection", batch_size: int = RESULT_BATCH_SIZE):
+    """Return an Arrow RecordBatchReader over the pending result of a DuckDB cursor."""
+    # fetch_record_batch() was renamed to to_arrow_reader() in newer DuckDB releases
+    if hasattr(cursor, "to_arrow_reader"):
+        return cursor.to_arrow_reader(batch_size)
+    return cursor.fetch_record_batch(batch_size)
+
+
+def non_finite_to_null(batch: "pa.RecordBatch") -> "pa.RecordBatch":
+    """Replace NaN and infinity in floating point columns with null, since JSON has neither."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    
+    columns = [
+        pc.if_else(pc.is_finite(col), col, pa.scalar(None, col.type))
+        if pa.types.is_floating(col.type) else col
+        for col in batch.columns
+    ]
+    return pa.RecordBatch.from_arrays(columns, schema=batch.schema)
+
+
+def finite_or_none(value: Any) -> Any:
+    """Recursively replace NaN and infinity inside nested lists and structs with None."""
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, list):
+        return [finite_or_none(v) for v in value]
+    if isinstance(value, dict):
+        return {k: finite_or_none(v) for k, v in value.items()}
+    return value
+
+
+def row_to_json(row: Dict[str, Any]) -> str:
+    """Serialize one row as strict JSON, nulling non-finite floats nested in list columns."""
+    try:
+        return json.dumps(row, default=str, allow_nan=False)
+    except ValueError:
+        return json.dumps(finite_or_none(row), default=str, allow_nan=False)
+
+
+def render_json_batches(reader) -> None:
+    """Write record batches as one JSON array, converting a single batch at a time."""
+    data_console.out("[")
+    separator = ""
+    for batch in reader:
+        if batch.num_rows == 0:
+            continue
+        rows = non_finite_to_null(batch).to_pylist()
+        records = ",\n".join(row_to_json(row) for row in rows)
+        data_console.out(separator + records, end="")
+        separator = ",\n"
+    data_console.out("\n]" if separator else "]")
 
 
 @app.command()
@@ -158,6 +300,8 @@ def list_tables(
     create: bool = typer.Option(False, "--create", help="Create the database if it doesn't exist"),
 ) -> None:
     """List all tables in a lancedb database."""
+    import lancedb
+    
     try:
         if not validate_database_exists(db_path, create=create):
             raise typer.Exit(1)
@@ -188,6 +332,8 @@ def query(
     create: bool = typer.Option(False, "--create", help="Create the database if it doesn't exist"),
 ) -> None:
     """Query a table from a lancedb database."""
+    import lancedb
+    
     try:
         if not validate_database_exists(db_path, create=create):
             raise typer.Exit(1)
@@ -199,24 +345,26 @@ def query(
         
         tbl = db.open_table(table)
         
-        # Build query
-        if where:
-            results = tbl.search().where(where).to_pandas()
-        else:
-            results = tbl.to_pandas()
-        
-        # Apply limit
-        if limit and len(results) > limit:
-            results = results.head(limit)
-        
-        # Select columns
+        # Build query so filter, projection and limit run inside LanceDB
+        q = tbl.search()
         if select:
             cols = [c.strip() for c in select.split(",")]
-            results = results[[c for c in cols if c in results.columns]]
-        
+            cols = [c for c in cols if c in tbl.schema.names]
+            if not cols:
+                console.print(f"[red]Error: None of the selected columns exist in '{table}'[/red]")
+                raise typer.Exit(1)
+            q = q.select(cols)
+        if where:
+            q = q.where(where)
+        q = q.limit(limit or None)
+
+        results = q.to_arrow()
+
         # Output
-        render_results(results, title=f"Query results from {table}", output_format=output)
+        render_arrow_results(results, title=f"Query results from {table}", output_format=output)
             
+    except typer.Exit:
+        raise
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
         raise typer.Exit(1)
@@ -229,6 +377,8 @@ def schema(
     create: bool = typer.Option(False, "--create", help="Create the database if it doesn't exist"),
 ) -> None:
     """Show schema of a table in a lancedb database."""
+    import lancedb
+    
     try:
         if not validate_database_exists(db_path, create=create):
             raise typer.Exit(1)
@@ -238,9 +388,10 @@ def schema(
         if not validate_table_exists(db, table):
             raise typer.Exit(1)
         
-        tbl = db.open_table(table)
+        # Table.schema is read from the dataset manifest; no rows are scanned
+        schema = db.open_table(table).schema
         console.print(f"\n[bold cyan]Schema for {table}:[/bold cyan]\n")
-        console.print(tbl.schema)
+        console.print(schema.to_string(), markup=False)
         
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
@@ -255,23 +406,30 @@ def sql(
     create: bool = typer.Option(False, "--create", help="Create the database if it doesn't exist"),
 ) -> None:
     """Execute a SQL query against a lancedb database."""
+    import duckdb
+    import lancedb
+    
     try:
         if not validate_database_exists(db_path, create=create):
             raise typer.Exit(1)
         
         db = lancedb.connect(db_path)
         
-        # Register all tables in duckdb
-        for table_name in get_table_names(db):
-            table = db.open_table(table_name)
-            arrow_table = table.to_lance()
-            duckdb.sql(f"CREATE TEMP VIEW {table_name} AS SELECT * FROM arrow_table")
+        # Register only the tables the query refers to
+        con = duckdb.connect()
+        for table_name in get_referenced_tables(sql_query, get_table_names(db)):
+            register_table(con, table_name, db.open_table(table_name))
         
         # Execute SQL query
-        results = duckdb.sql(sql_query).to_df()
+        cursor = con.execute(sql_query)
         
-        # Output
-        render_results(results, title="SQL Query Results", output_format=output)
+        # Output; JSON is streamed batch by batch
+        if output == "json":
+            render_json_batches(fetch_batches(cursor))
+        else:
+            render_arrow_results(
+                fetch_batches(cursor).read_all(), title="SQL Query Results", output_format=output
+            )
             
     except Exception as e:
         console.print(f"[red]Error: {e}[/red]")
@@ -286,6 +444,8 @@ def delete(
     create: bool = typer.Option(False, "--create", help="Create the database if it doesn't exist"),
 ) -> None:
     """Delete rows from a table in a lancedb database."""
+    import lancedb
+    
     try:
         if not validate_database_exists(db_path, create=create):
             raise typer.Exit(1)
@@ -297,11 +457,11 @@ def delete(
         
         tbl = db.open_table(table)
         
-        # Count rows before and after deletion
-        rows_before = len(tbl.to_pandas())
+        # Count matching rows up front so no scan is needed after deletion
+        rows_before = tbl.count_rows()
+        rows_deleted = tbl.count_rows(where)
         tbl.delete(where)
-        rows_after = len(tbl.to_pandas())
-        rows_deleted = rows_before - rows_after
+        rows_after = rows_before - rows_deleted
         
         console.print(f"[green]Successfully deleted {rows_deleted} row(s)[/green]")
         console.print(f"[cyan]Rows before: {rows_before}, Rows after: {rows_after}[/cyan]")
@@ -318,6 +478,8 @@ def empty(
     create: bool = typer.Option(False, "--create", help="Create the database if it doesn't exist"),
 ) -> None:
     """Empty a table by deleting all rows."""
+    import lancedb
+    
     try:
         if not validate_database_exists(db_path, create=create):
             raise typer.Exit(1)
@@ -329,11 +491,11 @@ def empty(
         
         tbl = db.open_table(table)
         
-        # Count rows before and after deletion
-        rows_before = len(tbl.to_pandas())
+        # Every row is deleted, so the row count before is all that is needed
+        rows_before = tbl.count_rows()
         tbl.delete("1=1")
-        rows_after = len(tbl.to_pandas())
-        rows_deleted = rows_before - rows_after
+        rows_deleted = rows_before
+        rows_after = 0
         
         console.print(f"[green]Successfully emptied table '{table}' - deleted {rows_deleted} row(s)[/green]")
         console.print(f"[cyan]Rows before: {rows_before}, Rows after: {rows_after}[/cyan]")
@@ -351,6 +513,8 @@ def drop(
     create: bool = typer.Option(False, "--create", help="Create the database if it doesn't exist"),
 ) -> None:
     """Drop (delete) an entire table from the database."""
+    import lancedb
+    
     try:
         if not validate_database_exists(db_path, create=create):
             raise typer.Exit(1)
@@ -362,12 +526,14 @@ def drop(
         
         # Ask for confirmation unless --confirm flag is provided
         if not confirm:
+            # Only needed for the prompt, so --confirm runs skip importing prompt_toolkit
+            from prompt_toolkit.shortcuts import confirm as confirm_prompt
+            
             console.print(f"[yellow]Warning: You are about to delete the entire table '{table}'[/yellow]")
             console.print("[yellow]This action cannot be undone.[/yellow]")
-            response = input("Are you sure? (yes/no): ").strip().lower()
-            if response != "yes":
+            if not confirm_prompt(f"Drop table '{table}'?"):
                 console.print("[cyan]Operation cancelled[/cyan]")
-                raise typer.Exit(0)
+                return
         
         # Drop the table
         db.drop_table(table)
@@ -388,6 +554,8 @@ def update(
     create: bool = typer.Option(False, "--create", help="Create the database if it doesn't exist"),
 ) -> None:
     """Update rows in a table that match a given expression."""
+    import lancedb
+    
     try:
         if not validate_database_exists(db_path, create=create):
             raise typer.Exit(1)
@@ -434,6 +602,9 @@ def load(
     create: bool = typer.Option(False, "--create", help="Create the database if it doesn't exist"),
 ) -> None:
     """Load a CSV file into a table in a lancedb database."""
+    import lancedb
+    import pandas as pd
+    
     try:
         if not validate_database_exists(db_path, create=create):
             raise typer.Exit(1)
@@ -490,6 +661,8 @@ def dump(
     overwrite: bool = typer.Option(False, "--overwrite", help="Overwrite output file if it exists"),
 ) -> None:
     """Dump a table from a lancedb database to a CSV file."""
+    import lancedb
+    
     try:
         if not validate_database_exists(db_path):
             raise typer.Exit(1)
@@ -532,15 +705,21 @@ def interactive(
     create: bool = typer.Option(False, "--create", help="Create the database if it doesn't exist"),
 ) -> None:
     """Interactive CLI for querying lancedb database."""
+    import duckdb
+    import lancedb
+    from prompt_toolkit import PromptSession, prompt
+    from prompt_toolkit.completion import WordCompleter
+    from prompt_toolkit.history import FileHistory, ThreadedHistory
+    from prompt_toolkit.lexers import PygmentsLexer
+    from prompt_toolkit.shortcuts import confirm as confirm_prompt
+    from pygments.lexers.sql import SqlLexer
+    
     try:
         if not validate_database_exists(db_path, create=create):
             raise typer.Exit(1)
         
         db = lancedb.connect(db_path)
         
-        # sql_keywords list
-        sql_keywords = ["SELECT", "FROM", "WHERE", "LIMIT", "ORDER BY", "GROUP BY", "INSERT", "DELETE", "UPDATE", "JOIN", "LEFT JOIN", "INNER JOIN", "ON", "AND", "OR", "NOT", "IN", "LIKE", "BETWEEN", "DISTINCT", "COUNT", "SUM", "AVG", "MIN", "MAX"]
-        
         # Set up history file
         history_file = Path.home() / ".lancedb_history"
         
@@ -553,44 +732,77 @@ def interactive(
         console.print("  .delete       - Delete rows (.delete <table> <where_clause>)")
         console.print("  .empty        - Empty a table (.empty <table>)")
         console.print("  .drop         - Drop an entire table (.drop <table>)")
+        console.print("  .begin        - Queue .update commands until .commit (other writes and SQL are refused)")
+        console.print("  .commit       - Apply queued updates all or nothing, merging those with the same WHERE")
+        console.print("  .rollback     - Discard queued updates")
         console.print("  .exit         - Exit interactive mode")
         console.print("[yellow]Or type SQL queries directly[/yellow]\n")
         
-        # Cache for table DataFrames
-        table_cache = {}
+        # Updates queued between .begin and .commit, keyed by table; None outside a batch
+        pending_updates: Optional[Dict[str, List[Tuple[str, Dict[str, Any]]]]] = None
+        
+        # Persistent DuckDB connection holding one registration per table
+        con = duckdb.connect()
+        
+        # Cached table names, reloaded only on .refresh and updated on .drop
+        table_names: Set[str] = set(get_table_names(db))
+        
+        # Set up completion; the word list is swapped in place when tables change
+        completer = WordCompleter(
+            [*SQL_KEYWORDS, *DOT_COMMANDS, *sorted(table_names)], ignore_case=True
+        )
+        
+        def update_completions():
+            """Sync the completer word list with the cached table names."""
+            completer.words = [*SQL_KEYWORDS, *DOT_COMMANDS, *sorted(table_names)]
         
-        def get_table_names_interactive():
-            """Get table names for interactive mode."""
-            return get_table_names(db)
+        # Open table handles reused across commands; purged on .refresh, .drop and errors
+        table_handles: Dict[str, Any] = {}
+        
+        def open_table(tbl_name: str):
+            """Return the cached handle for a table, moved to its latest version."""
+            tbl = table_handles.get(tbl_name)
+            if tbl is not None and hasattr(tbl, "checkout_latest"):
+                # Pick up writes made by other processes since the handle was opened
+                tbl.checkout_latest()
+            else:
+                tbl = db.open_table(tbl_name)
+                table_handles[tbl_name] = tbl
+            return tbl
         
         def refresh_views():
-            """Refresh all DuckDB views from LanceDB tables."""
-            table_cache.clear()
-            for table_name in get_table_names_interactive():
+            """Reload table names and refresh all DuckDB views from LanceDB tables."""
+            table_handles.clear()
+            table_names.clear()
+            table_names.update(get_table_names(db))
+            update_completions()
+            for table_name in table_names:
                 try:
-                    table = db.open_table(table_name)
-                    df = table.to_pandas()
-                    table_cache[table_name] = df
-                    duckdb.sql(f"DROP VIEW IF EXISTS {table_name}")
-                    duckdb.register(table_name, df)
+                    register_table(con, table_name, open_table(table_name))
                 except Exception as e:
                     console.print(f"[yellow]Warning: Could not refresh view for {table_name}: {e}[/yellow]")
         
         def execute_update(tbl_name: str, set_clause: str, where_clause: str) -> bool:
             """Execute update command. Returns True on success."""
-            if tbl_name not in get_table_names_interactive():
+            if tbl_name not in table_names:
                 console.print(f"[red]Error: Table '{tbl_name}' not found[/red]")
                 return False
             
             try:
-                tbl = db.open_table(tbl_name)
                 update_values = parse_set_clause(set_clause)
+                if pending_updates is not None:
+                    # Check the filter now so a typo is reported here, not at .commit
+                    open_table(tbl_name).count_rows(where_clause)
+                    pending_updates.setdefault(tbl_name, []).append((where_clause, update_values))
+                    queued = sum(len(updates) for updates in pending_updates.values())
+                    console.print(f"[cyan]Queued update for '{tbl_name}' ({queued} pending)[/cyan]")
+                    return True
+                
+                tbl = open_table(tbl_name)
                 tbl.update(where=where_clause, values=update_values)
                 
                 # Refresh duckdb view with updated data
-                df = tbl.to_pandas()
-                table_cache[tbl_name] = df
-                duckdb.register(tbl_name, df)
+                register_table(con, tbl_name, tbl)
                 
                 console.print(f"[green]Successfully updated rows in '{tbl_name}'[/green]")
                 console.print(f"[cyan]Updated columns: {list(update_values.keys())}[/cyan]")
@@ -600,92 +812,234 @@ def interactive(
                 console.print(f"[red]Error: {ve}[/red]")
                 return False
             except Exception as e:
+                table_handles.pop(tbl_name, None)
                 console.print(f"[red]Error: {e}[/red]")
                 return False
         
+        def execute_commit() -> bool:
+            """Apply queued updates, rolling every table back if any of them fails. Returns True on success."""
+            nonlocal pending_updates
+            updates_by_table, pending_updates = pending_updates, None
+            
+            # Version of each table before the batch touched it, for rollback
+            versions: Dict[str, int] = {}
+            tbl_name = None
+            try:
+                for tbl_name, updates in updates_by_table.items():
+                    tbl = open_table(tbl_name)
+                    versions[tbl_name] = tbl.version
+                    for where_clause, update_values in coalesce_updates(updates):
+                        tbl.update(where=where_clause, values=update_values)
+            except Exception as e:
+                console.print(f"[red]Error updating '{tbl_name}': {e}[/red]")
+                for name, version in versions.items():
+                    table_handles.pop(name, None)
+                    try:
+                        tbl = open_table(name)
+                        if tbl.version != version:
+                            tbl.restore(version)
+                        register_table(con, name, tbl)
+                    except Exception as restore_error:
+                        console.print(f"[red]Could not roll back '{name}' to version {version}: {restore_error}[/red]")
+                queued = sum(len(updates) for updates in updates_by_table.values())
+                console.print(f"[yellow]Rolled back the batch; none of the {queued} queued update(s) were applied[/yellow]")
+                return False
+            
+            for tbl_name, updates in updates_by_table.items():
+                # Refresh duckdb view once for the whole batch
+                register_table(con, tbl_name, table_handles[tbl_name])
+                console.print(f"[green]Applied {len(updates)} update(s) to '{tbl_name}'[/green]")
+            return True
+        
         def execute_delete(tbl_name: str, where_clause: str) -> bool:
             """Execute delete command. Returns True on success."""
-            if tbl_name not in get_table_names_interactive():
+            if tbl_name not in table_names:
                 console.print(f"[red]Error: Table '{tbl_name}' not found[/red]")
                 return False
             
             try:
-                tbl = db.open_table(tbl_name)
-                rows_before = len(tbl.to_pandas())
+                tbl = open_table(tbl_name)
+                rows_before = tbl.count_rows()
+                rows_deleted = tbl.count_rows(where_clause)
                 tbl.delete(where_clause)
-                rows_after = len(tbl.to_pandas())
-                rows_deleted = rows_before - rows_after
+                rows_after = rows_before - rows_deleted
                 
                 # Refresh duckdb view
-                df = tbl.to_pandas()
-                table_cache[tbl_name] = df
-                duckdb.register(tbl_name, df)
+                register_table(con, tbl_name, tbl)
                 
                 console.print(f"[green]Successfully deleted {rows_deleted} row(s)[/green]")
                 console.print(f"[cyan]Rows before: {rows_before}, Rows after: {rows_after}[/cyan]")
                 return True
             except Exception as e:
+                table_handles.pop(tbl_name, None)
                 console.print(f"[red]Error: {e}[/red]")
                 return False
         
         def execute_empty(tbl_name: str) -> bool:
             """Execute empty command. Returns True on success."""
-            if tbl_name not in get_table_names_interactive():
+            if tbl_name not in table_names:
                 console.print(f"[red]Error: Table '{tbl_name}' not found[/red]")
                 return False
             
             try:
-                tbl = db.open_table(tbl_name)
-                rows_before = len(tbl.to_pandas())
+                tbl = open_table(tbl_name)
+                rows_before = tbl.count_rows()
                 tbl.delete("1=1")
-                rows_after = len(tbl.to_pandas())
-                rows_deleted = rows_before - rows_after
+                rows_deleted = rows_before
+                rows_after = 0
                 
                 # Refresh duckdb view
-                df = tbl.to_pandas()
-                table_cache[tbl_name] = df
-                duckdb.register(tbl_name, df)
+                register_table(con, tbl_name, tbl)
                 
                 console.print(f"[green]Successfully emptied table '{tbl_name}' - deleted {rows_deleted} row(s)[/green]")
                 console.print(f"[cyan]Rows before: {rows_before}, Rows after: {rows_after}[/cyan]")
                 return True
             except Exception as e:
+                table_handles.pop(tbl_name, None)
                 console.print(f"[red]Error: {e}[/red]")
                 return False
         
         def execute_drop(tbl_name: str) -> bool:
             """Execute drop command. Returns True on success."""
-            if tbl_name not in get_table_names_interactive():
+            if tbl_name not in table_names:
                 console.print(f"[red]Error: Table '{tbl_name}' not found[/red]")
                 return False
             
             try:
                 console.print(f"[yellow]Warning: You are about to delete the entire table '{tbl_name}'[/yellow]")
                 console.print("[yellow]This action cannot be undone.[/yellow]")
-                response = input("Are you sure? (yes/no): ").strip().lower()
-                if response != "yes":
+                if not confirm_prompt(f"Drop table '{tbl_name}'?"):
                     console.print("[cyan]Operation cancelled[/cyan]")
                     return False
                 
                 db.drop_table(tbl_name)
-                duckdb.sql(f"DROP VIEW IF EXISTS {tbl_name}")
+                con.unregister(tbl_name)
+                table_handles.pop(tbl_name, None)
+                table_names.discard(tbl_name)
+                update_completions()
                 
                 console.print(f"[green]Successfully dropped table '{tbl_name}'[/green]")
                 return True
             except Exception as e:
+                table_handles.pop(tbl_name, None)
                 console.print(f"[red]Error: {e}[/red]")
                 return False
         
+        def confirm_next_page() -> bool:
+            """Ask whether to show the next page of query results."""
+            try:
+                answer = prompt("-- More -- (Enter to continue, q to stop) ")
+            except (KeyboardInterrupt, EOFError):
+                return False
+            return answer.strip().lower() != "q"
+        
+        def show_tables(args: str) -> None:
+            """Handle .tables."""
+            table = Table(title="Available Tables")
+            table.add_column("Table Name", style="cyan")
+            for tbl_name in sorted(table_names):
+                table.add_row(tbl_name)
+            console.print(table)
+        
+        def show_schema(args: str) -> None:
+            """Handle .schema <table_name>."""
+            if not args:
+                console.print("[red]Usage: .schema <table_name>[/red]")
+                return
+            if args not in table_names:
+                console.print(f"[red]Error: Table '{args}' not found[/red]")
+                return
+            schema = open_table(args).schema
+            console.print(f"\n[bold cyan]Schema for {args}:[/bold cyan]\n")
+            console.print(schema.to_string(), markup=False)
+            console.print()
+        
+        def refresh_all(args: str) -> None:
+            """Handle .refresh."""
+            console.print("[cyan]Refreshing all table views...[/cyan]")
+            refresh_views()
+            console.print("[green]All views refreshed successfully[/green]")
+        
+        def update_rows(args: str) -> None:
+            """Handle .update <table> <set_clause> <where_clause>."""
+            parts = args.split(None, 2)
+            if len(parts) < 3:
+                console.print("[red]Usage: .update <table> <set_clause> <where_clause>[/red]")
+                console.print("[yellow]Example: .update speakers name='John' id=1[/yellow]")
+                return
+            execute_update(parts[0], parts[1], parts[2])
+        
+        def delete_rows(args: str) -> None:
+            """Handle .delete <table> <where_clause>."""
+            parts = args.split(None, 1)
+            if len(parts) < 2:
+                console.print("[red]Usage: .delete <table> <where_clause>[/red]")
+                return
+            execute_delete(parts[0], parts[1])
+        
+        def empty_table(args: str) -> None:
+            """Handle .empty <table>."""
+            if not args:
+                console.print("[red]Usage: .empty <table>[/red]")
+                return
+            execute_empty(args)
+        
+        def drop_table(args: str) -> None:
+            """Handle .drop <table>."""
+            if not args:
+                console.print("[red]Usage: .drop <table>[/red]")
+                return
+            execute_drop(args)
+        
+        def begin_batch(args: str) -> None:
+            """Handle .begin."""
+            nonlocal pending_updates
+            if pending_updates is not None:
+                console.print("[yellow]A batch is already open; use .commit or .rollback[/yellow]")
+                return
+            pending_updates = {}
+            console.print("[cyan]Batch started: .update commands are queued until .commit[/cyan]")
+        
+        def commit_batch(args: str) -> None:
+            """Handle .commit."""
+            if pending_updates is None:
+                console.print("[red]Error: No batch in progress; use .begin first[/red]")
+                return
+            execute_commit()
+        
+        def rollback_batch(args: str) -> None:
+            """Handle .rollback."""
+            nonlocal pending_updates
+            if pending_updates is None:
+                console.print("[red]Error: No batch in progress; use .begin first[/red]")
+                return
+            discarded = sum(len(updates) for updates in pending_updates.values())
+            pending_updates = None
+            console.print(f"[cyan]Discarded {discarded} queued update(s)[/cyan]")
+        
+        # Dot-commands are dispatched on their lowercased first word
+        dot_command_handlers = {
+            ".tables": show_tables,
+            ".schema": show_schema,
+            ".refresh": refresh_all,
+            ".update": update_rows,
+            ".delete": delete_rows,
+            ".empty": empty_table,
+            ".drop": drop_table,
+            ".begin": begin_batch,
+            ".commit": commit_batch,
+            ".rollback": rollback_batch,
+        }
+        
         # Register all tables in duckdb upfront
         refresh_views()
         
         # Set up prompt session
-        dot_commands = [".tables", ".schema", ".refresh", ".update", ".delete", ".empty", ".drop", ".exit"]
-        all_completions = sql_keywords + dot_commands + get_table_names_interactive()
+        # History is loaded and appended to on a background thread
         session = PromptSession(
-            history=FileHistory(str(history_file)),
+            history=ThreadedHistory(FileHistory(str(history_file))),
             lexer=PygmentsLexer(SqlLexer),
-            completer=WordCompleter(all_completions, ignore_case=True),
+            completer=completer,
         )
         
         while True:
@@ -697,76 +1051,29 @@ def interactive(
                     continue
                 
                 # Handle special commands
-                if query_input.lower() == ".tables":
-                    tables = get_table_names_interactive()
-                    table = Table(title="Available Tables")
-                    table.add_column("Table Name", style="cyan")
-                    for tbl_name in tables:
-                        table.add_row(tbl_name)
-                    console.print(table)
-                    continue
+                command, _, args = query_input.partition(" ")
+                command = command.lower()
                 
-                if query_input.lower().startswith(".schema"):
-                    parts = query_input.split(None, 1)
-                    if len(parts) < 2:
-                        console.print("[red]Usage: .schema <table_name>[/red]")
-                        continue
-                    tbl_name = parts[1]
-                    if tbl_name not in get_table_names_interactive():
-                        console.print(f"[red]Error: Table '{tbl_name}' not found[/red]")
-                        continue
-                    tbl = db.open_table(tbl_name)
-                    console.print(f"\n[bold cyan]Schema for {tbl_name}:[/bold cyan]\n")
-                    console.print(tbl.schema)
-                    console.print()
-                    continue
-                
-                if query_input.lower() == ".exit":
+                if command == ".exit":
+                    if pending_updates:
+                        console.print("[yellow]Discarding queued updates that were not committed[/yellow]")
                     console.print("[yellow]Goodbye![/yellow]")
                     break
                 
-                if query_input.lower() == ".refresh":
-                    console.print("[cyan]Refreshing all table views...[/cyan]")
-                    refresh_views()
-                    console.print("[green]All views refreshed successfully[/green]")
-                    continue
-                
-                if query_input.lower().startswith(".update"):
-                    parts = query_input.split(None, 3)
-                    if len(parts) < 4:
-                        console.print("[red]Usage: .update <table> <set_clause> <where_clause>[/red]")
-                        console.print("[yellow]Example: .update speakers name='John' id=1[/yellow]")
-                        continue
-                    execute_update(parts[1], parts[2], parts[3])
-                    continue
-                
-                if query_input.lower().startswith(".delete"):
-                    parts = query_input.split(None, 2)
-                    if len(parts) < 3:
-                        console.print("[red]Usage: .delete <table> <where_clause>[/red]")
-                        continue
-                    execute_delete(parts[1], parts[2])
+                # Inside a batch, anything that would run ahead of the queued updates is refused
+                if pending_updates is not None and command not in BATCH_COMMANDS:
+                    console.print("[red]Error: Only .update, .tables, .schema and .refresh can run inside a batch[/red]")
+                    console.print("[yellow]Use .commit or .rollback to end the batch first[/yellow]")
                     continue
                 
-                if query_input.lower().startswith(".empty"):
-                    parts = query_input.split(None, 1)
-                    if len(parts) < 2:
-                        console.print("[red]Usage: .empty <table>[/red]")
-                        continue
-                    execute_empty(parts[1])
+                handler = dot_command_handlers.get(command)
+                if handler is not None:
+                    handler(args.strip())
                     continue
                 
-                if query_input.lower().startswith(".drop"):
-                    parts = query_input.split(None, 1)
-                    if len(parts) < 2:
-                        console.print("[red]Usage: .drop <table>[/red]")
-                        continue
-                    execute_drop(parts[1])
-                    continue
-                
-                # Execute SQL query
+                # Execute SQL query and stream the results one page at a time
                 try:
-                    results = duckdb.sql(query_input).to_df()
+                    reader = fetch_batches(con.execute(query_input))
                 except Exception as e:
                     # Check if it's a schema mismatch error
                     if "types don't match" in str(e) or "Contents of view were altered" in str(e):
@@ -774,22 +1081,27 @@ def interactive(
                         refresh_views()
                         console.print("[cyan]Retrying query...[/cyan]")
                         try:
-                            results = duckdb.sql(query_input).to_df()
+                            reader = fetch_batches(con.execute(query_input))
                         except Exception as retry_e:
                             console.print(f"[red]Error: {retry_e}[/red]")
                             continue
                     else:
                         raise
                 
-                if len(results) == 0:
+                rows_shown = 0
+                for batch in reader:
+                    if batch.num_rows == 0:
+                        continue
+                    if rows_shown and not confirm_next_page():
+                        break
+                    render_arrow_results(
+                        batch,
+                        title=f"Query Results (rows {rows_shown + 1}-{rows_shown + batch.num_rows})",
+                    )
+                    rows_shown += batch.num_rows
+                
+                if rows_shown == 0:
                     console.print("[yellow]No results[/yellow]")
-                else:
-                    rich_table = Table(title=f"Query Results ({len(results)} rows)")
-                    for col in results.columns:
-                        rich_table.add_column(str(col), style="cyan")
-                    for _, row in results.iterrows():
-                        rich_table.add_row(*[truncate_value(v) for v in row])
-                    console.print(rich_table)
                 
             except KeyboardInterrupt:
                 console.print("\n[yellow]Interrupted[/yellow]")
@@ -29,8 +29,9 @@ setup(
     packages=find_packages(),
     python_requires=">=3.8",
     install_requires=[
-        "lancedb>=0.1.0",
+        "lancedb>=0.14.0",
         "duckdb>=0.5.0",
+        "pyarrow>=12.0.0",
         "pandas>=1.0.0",
         "typer[all]>=0.9.0",
         "rich>=13.0.0",
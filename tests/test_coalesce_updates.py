@@ -0,0 +1,47 @@
+"""Tests for merging queued interactive updates."""
+
+import lancedb
+import pyarrow as pa
+
+from lancedb_cli.__main__ import coalesce_updates
+
+
+def test_merges_updates_sharing_a_where_clause():
+    updates = [("id = 1", {"name": "a"}), ("id = 1", {"age": 3}), ("id = 2", {"age": 4})]
+    assert coalesce_updates(updates) == [
+        ("id = 1", {"name": "a", "age": 3}),
+        ("id = 2", {"age": 4}),
+    ]
+
+
+def test_later_values_win_within_a_merged_run():
+    updates = [("id = 1", {"age": 3}), ("id = 1", {"age": 5})]
+    assert coalesce_updates(updates) == [("id = 1", {"age": 5})]
+
+
+def test_does_not_merge_when_where_reads_a_column_set_earlier():
+    updates = [
+        ("status = 'pending'", {"status": "done"}),
+        ("status = 'pending'", {"status": "archived"}),
+    ]
+    assert coalesce_updates(updates) == updates
+
+
+def test_coalesced_updates_match_sequential_application(tmp_path):
+    db = lancedb.connect(str(tmp_path))
+    data = pa.table({"id": [1, 2], "status": ["pending", "pending"]})
+    updates = [
+        ("status = 'pending'", {"status": "done"}),
+        ("status = 'pending'", {"status": "archived"}),
+    ]
+
+    sequential = db.create_table("sequential", data)
+    for where, values in updates:
+        sequential.update(where=where, values=values)
+
+    coalesced = db.create_table("coalesced", data)
+    for where, values in coalesce_updates(updates):
+        coalesced.update(where=where, values=values)
+
+    assert coalesced.to_arrow().sort_by("id") == sequential.to_arrow().sort_by("id")
+    assert coalesced.to_arrow()["status"].to_pylist() == ["done", "done"]
@@ -0,0 +1,73 @@
+"""Tests for parsing the SET clause of update commands."""
+
+import pytest
+
+from lancedb_cli.__main__ import convert_value, parse_set_clause
+
+
+def test_parses_comma_separated_pairs():
+    assert parse_set_clause("name='John', age=30") == {"name": "John", "age": 30}
+
+
+def test_keeps_commas_inside_quotes():
+    assert parse_set_clause("name='Doe, John', city=\"Rome, IT\"") == {
+        "name": "Doe, John",
+        "city": "Rome, IT",
+    }
+
+
+def test_keeps_apostrophe_inside_double_quotes():
+    assert parse_set_clause("name=\"it's\", age=1") == {"name": "it's", "age": 1}
+
+
+def test_splits_only_on_the_first_equals_sign():
+    assert parse_set_clause("expr='a=b', x = 1") == {"expr": "a=b", "x": 1}
+
+
+def test_unterminated_quote_runs_to_the_end():
+    assert parse_set_clause("x=it's, y=1") == {"x": "it's, y=1"}
+
+
+def test_allows_a_trailing_comma():
+    assert parse_set_clause("a=1,") == {"a": 1}
+
+
+@pytest.mark.parametrize("set_clause", ["a=1,,b=2", ",a=1", "a=1,,", "a=1, ,b=2", "a=1, b"])
+def test_rejects_empty_or_incomplete_pairs(set_clause):
+    with pytest.raises(ValueError):
+        parse_set_clause(set_clause)
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("true", True),
+        ("TRUE", True),
+        ("False", False),
+        ("null", None),
+        ("None", None),
+        ("NONE", None),
+        ("42", 42),
+        ("-7", -7),
+        ("+7", 7),
+        ("1_000", 1000),
+        ("1.5", 1.5),
+        (".5", 0.5),
+        ("5.", 5.0),
+        ("-2.5", -2.5),
+        ("1.5e3", 1500.0),
+        ("1e5", "1e5"),
+        ("'42'", "42"),
+        ('"1.5"', "1.5"),
+        ("'hello'", "hello"),
+        ("''", ""),
+        ("'", ""),
+        ('"', ""),
+        ("'mixed\"", "'mixed\""),
+        ("hello", "hello"),
+    ],
+)
+def test_convert_value(value, expected):
+    result = convert_value(value)
+    assert result == expected
+    assert type(result) is type(expected)